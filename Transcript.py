@@ -1,192 +1,611 @@
 # transcript_evaluator.py
+import os
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")  # One core per Tesseract engine; concurrency comes from us
+# Prefer the tessdata_fast models (eng, ara) when they are installed
+TESSDATA_FAST_DIR = os.getenv("TESSDATA_FAST_DIR", "/usr/share/tessdata_fast")
+if os.path.isdir(TESSDATA_FAST_DIR):
+    os.environ.setdefault("TESSDATA_PREFIX", TESSDATA_FAST_DIR)
+
+# Heavy parsing/OCR/scraping libraries are imported where they are used, keeping cold start cheap
 import streamlit as st
-import pdfplumber
-import pytesseract
-from docx import Document
-from PIL import Image
-import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import numpy as np
 import io
 import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from time import sleep
-import random
-from functools import lru_cache
+import hashlib
+from time import sleep, monotonic
+from urllib.parse import urlparse
+from collections import defaultdict, deque
+import threading
+import diskcache
+import pybreaker
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # --------------------------
 # Configuration
 # --------------------------
-pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'  # Update for your OS
 DEEPSEEK_API_URL ="https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_MODEL = "deepseek-chat"
+MAX_TRANSCRIPT_CHARS = 8000
+MAX_BATCH_CHARS = 32000  # Aggregate input per batched DeepSeek request
+DEEPSEEK_CONCURRENCY = 8
 COUNTRIES = ["India", "Pakistan", "Saudi Arabia", "Germany", "Nigeria", "Bangladesh"]
+BORN_DIGITAL_MIN_CHARS = 200  # Embedded text in the first pages above which a PDF skips OCR
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 1))
+OCR_MAX_SIDE = 2200  # px on the long side; about 190-200 DPI for a letter/A4 page, more only slows Tesseract down
+REQUEST_TIMEOUT = (3, 10)  # (connect, read) seconds
+ACCREDITATION_TTL = 7 * 86400  # seconds
+ANALYSIS_TTL = 30 * 86400  # seconds
+REGISTRY_REQUESTS_PER_MIN = 20  # Per host
+REGISTRY_INDEX_TTL = 86400  # seconds
+UGC_INDIA_URL = "https://www.ugc.ac.in/recog_College.aspx"
+HEC_PAKISTAN_URL = "https://www.hec.gov.pk/english/universities/Pages/Recognized-Universities.aspx"
+MOE_SAUDI_URL = "https://www.moe.gov.sa/en/education/highereducation/Pages/Government-Universities.aspx"
+ANABIN_GERMANY_URL = "https://anabin.kmk.org/no_cache/filter/institutionen.html"
+NUC_NIGERIA_URL = "https://www.nuc.edu.ng/nigerian-universities/"
+UGC_BANGLADESH_URL = "http://www.ugc.gov.bd/en/home/privateuniversity/2"
+# Static registry pages matched locally: URL -> CSS selector of the institution name entries,
+# or None to match against the whole page text
+REGISTRY_INDEXES = {
+    HEC_PAKISTAN_URL: 'div.university-name',
+    MOE_SAUDI_URL: None,
+    NUC_NIGERIA_URL: None,
+    UGC_BANGLADESH_URL: 'div.content-body li'
+}
+INSTITUTION_ABBREVIATIONS = {
+    "univ": "university",
+    "inst": "institute",
+    "coll": "college",
+    "dept": "department"
+}
+# One alternation for every abbreviation, compiled once
+_ABBR = re.compile(r"\b(" + "|".join(INSTITUTION_ABBREVIATIONS) + r")\b", re.I)
+# Just the institution phrase ("FAST National University", "University of Karachi"), not its whole line;
+# words are single-space separated so wider column gaps end the phrase, and "Institute:" labels are skipped
+_NAME_WORD = r"[A-Z][\w.'&-]*"
+INSTITUTION_PATTERN = re.compile(
+    rf"(?:{_NAME_WORD}(?: |(?<=-))){{0,4}}(?i:universit\w*|college|institute)\b(?!:)"
+    rf"(?: (?i:of|for) (?:(?i:the) )?{_NAME_WORD}(?: (?:(?i:and|&) )?{_NAME_WORD}){{0,3}})?"
+)
+INSTITUTION_MATCH_SCORE = 90  # token_sort_ratio at which the regex guess counts as the LLM's institution
+MIN_GUESS_WORDS = 3  # The keyword plus at least two more words; "College" alone names nothing
+
+# Module code re-runs on every Streamlit rerun, so process-wide state (connection pools, the disk cache)
+# is built by st.cache_resource factories and shared across reruns and sessions
+
+@st.cache_resource(show_spinner=False)
+def disk_cache():
+    """On disk so accreditation results and transcript analyses survive reruns and restarts."""
+    return diskcache.Cache(os.getenv("TRANSCRIPT_CACHE_DIR", "./.acc_cache"))
+
+@st.cache_resource(show_spinner=False)
+def registry_session():
+    """Keep-alive session for the accreditation registries, so repeat checks skip the TCP/TLS handshake."""
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip"})
+    # Retrying POST is safe here: the only POST is UGC India's read-only search form
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, connect=2, read=2, backoff_factor=0.5,
+                          status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=frozenset(["GET", "POST"]))
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource(show_spinner=False)
+def deepseek_session():
+    """DeepSeek completions are billed and not idempotent: only retry when the request never reached the
+    model (connection failures) or was rejected by rate limiting (429)."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        max_retries=Retry(total=2, connect=2, read=0, other=0, status=2, backoff_factor=0.5,
+                          status_forcelist=(429,),
+                          allowed_methods=frozenset(["POST"]))
+    ))
+    return session
+
+CACHE = disk_cache()
+SESSION = registry_session()
+DEEPSEEK_SESSION = deepseek_session()
 
 # --------------------------
 # Document Processing
 # --------------------------
 def extract_text(uploaded_file, country):
     try:
-        if uploaded_file.type == "application/pdf":
-            with pdfplumber.open(uploaded_file) as pdf:
-                return " ".join([page.extract_text() for page in pdf.pages])
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            doc = Document(uploaded_file)
-            return " ".join([para.text for para in doc.paragraphs])
-        elif uploaded_file.type.startswith('image'):
-            img = Image.open(io.BytesIO(uploaded_file.read()))
-            lang = 'ara' if country == "Saudi Arabia" else 'eng'
-            return pytesseract.image_to_string(img, lang=lang)
-        return None
+        return extract_text_cached(uploaded_file.getvalue(), uploaded_file.type, country)
     except Exception as e:
         st.error(f"Document processing error: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def extract_text_cached(file_bytes: bytes, mime: str, country: str):
+    """Keyed on the raw bytes so Streamlit reruns skip re-parsing; errors propagate uncached."""
+    lang = 'ara' if country == "Saudi Arabia" else 'eng'
+    if mime == "application/pdf":
+        import pymupdf
+        with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
+            sample = sum(len(doc[i].get_text()) for i in range(min(3, doc.page_count)))
+            if sample > BORN_DIGITAL_MIN_CHARS:
+                return " ".join(page.get_text("text") for page in doc)
+            # Scanned PDF: rasterize the pages and OCR them concurrently
+            return " ".join(ocr_images([render_page_gray(page) for page in doc], lang))
+    elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        from docx import Document
+        doc = Document(io.BytesIO(file_bytes))
+        return " ".join([para.text for para in doc.paragraphs])
+    elif mime.startswith('image'):
+        return " ".join(ocr_images([file_bytes], lang))
+    return None
+
+@st.cache_resource(show_spinner=False)
+def tesseract_engines():
+    """Thread-local engine registry: each OCR worker keeps its own loaded Tesseract engine per language.
+
+    Cached so it outlives reruns, together with the worker threads in ocr_executor.
+    """
+    return threading.local()
+
+_TESS = tesseract_engines()
+
+@st.cache_resource(show_spinner=False)
+def ocr_executor():
+    """Long-lived OCR threads, so their Tesseract engines survive across uploads."""
+    return ThreadPoolExecutor(max_workers=OCR_CONCURRENCY, thread_name_prefix="ocr")
+
+def _tess_api(lang):
+    import tesserocr
+    apis = _TESS.__dict__.setdefault("apis", {})
+    if lang not in apis:
+        apis[lang] = tesserocr.PyTessBaseAPI(
+            path=os.getenv("TESSDATA_PREFIX", tesserocr.get_languages()[0]),
+            lang=lang,
+            oem=tesserocr.OEM.LSTM_ONLY,
+            psm=tesserocr.PSM.SINGLE_BLOCK,
+            variables={"tessedit_do_invert": "0"}  # Input is already binarized dark-on-light
+        )
+    return apis[lang]
+
+def render_page_gray(page):
+    """Render a PDF page straight to a grayscale array whose long side is OCR_MAX_SIDE."""
+    import pymupdf
+    dpi = int(OCR_MAX_SIDE * 72 / max(page.rect.width, page.rect.height))
+    pix = page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY, alpha=False)
+    return np.ascontiguousarray(np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.stride)[:, :pix.width])
+
+def _ocr_image(image, lang):
+    img = preprocess_image(image)
+    h, w = img.shape
+    api = _tess_api(lang)
+    api.SetImageBytes(img.tobytes(), w, h, 1, w)
+    return api.GetUTF8Text()
+
+def ocr_images(images, lang):
+    """OCR encoded image bytes or grayscale arrays concurrently, returning text in input order."""
+    return list(ocr_executor().map(lambda image: _ocr_image(image, lang), images))
+
+def preprocess_image(image):
+    """Grayscale, downscale to OCR_MAX_SIDE and Otsu-binarize an encoded image (or grayscale array)."""
+    import cv2
+    if isinstance(image, np.ndarray):
+        img = image
+    else:
+        img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError("Unreadable image")
+    h, w = img.shape
+    scale = OCR_MAX_SIDE / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    _, img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return np.ascontiguousarray(img)
+
 # --------------------------
 # DeepSeek-R1 Integration
 # --------------------------
-def analyze_with_deepseek(text, country):
-    headers = {
-        "Authorization": f"Bearer {st.secrets['DEEPSEEK_API_KEY']}",
-        "Content-Type": "application/json"
-    }
-    
-    system_prompt = """Extract from transcript as JSON:
-{{
+TRANSCRIPT_SCHEMA = """{
   "institution_name": "Official name",
   "original_gpa": number,
   "gpa_scale": "Original scale",
   "degree_name": "Degree title",
-  "courses": [{{"code": str, "name": str, "credits": number, "grade": str}}],
+  "courses": [{"code": str, "name": str, "credits": number, "grade": str}],
   "us_degree_equivalent": "US equivalent"
-}}
-Country: {country}"""
+}"""
+
+# System prompts stay byte-identical across calls so DeepSeek's prefix cache can reuse them;
+# the country travels in the user message instead
+SYSTEM_PROMPT = f"""Extract from transcript as JSON:
+{TRANSCRIPT_SCHEMA}
+The user message starts with the country of education."""
+
+BATCH_SYSTEM_PROMPT = f"""Several transcripts follow, each introduced by a ===DOC <doc_id>=== line.
+Extract every transcript as JSON: {{"transcripts": [{{"doc_id": number, ...}}]}} where each entry has:
+{TRANSCRIPT_SCHEMA}
+The user message starts with the country of education."""
+
+def analysis_cache_key(text, country):
+    normalized = re.sub(r"\s+", " ", text).strip()[:MAX_TRANSCRIPT_CHARS]
+    digest = hashlib.blake2b(f"{DEEPSEEK_MODEL}|{country}|{normalized}".encode(), digest_size=16).hexdigest()
+    return f"analysis:{digest}"
+
+def analyze_with_deepseek(text, country):
+    key = analysis_cache_key(text, country)
+    analysis = CACHE.get(key)
+    if analysis is not None:
+        return analysis
+    
+    try:
+        analysis = deepseek_completion(SYSTEM_PROMPT, f"Country: {country}\n\n{text[:MAX_TRANSCRIPT_CHARS]}")
+    except Exception as e:
+        st.error(f"DeepSeek API Error: {str(e)}")
+        return None
+    CACHE.set(key, analysis, expire=ANALYSIS_TTL)
+    return analysis
+
+def analyze_batch_with_deepseek(batch, country):
+    """Analyze several (doc_id, text) pairs in one request; returns {doc_id: analysis}."""
+    user_content = f"Country: {country}\n\n" + "\n\n".join(f"===DOC {doc_id}===\n{text}" for doc_id, text in batch)
+    
+    try:
+        result = deepseek_completion(BATCH_SYSTEM_PROMPT, user_content, max_tokens=min(8192, 2048 * len(batch)))
+        expected = {doc_id for doc_id, _ in batch}
+        return {
+            entry["doc_id"]: entry
+            for entry in result.get("transcripts", [])
+            if isinstance(entry, dict) and entry.get("doc_id") in expected
+        }
+    except Exception:
+        # Caller retries anything missing one document at a time
+        return {}
+
+def analyze_transcripts(texts, country):
+    """Analyze transcripts in as few DeepSeek requests as possible, preserving input order."""
+    keys = [analysis_cache_key(text, country) for text in texts]
+    results = [CACHE.get(key) for key in keys]
+    pending = [doc_id for doc_id, analysis in enumerate(results) if analysis is None]
+    if len(pending) <= 1:
+        for doc_id in pending:
+            results[doc_id] = analyze_with_deepseek(texts[doc_id], country)
+        return results
+    
+    with script_executor(max_workers=DEEPSEEK_CONCURRENCY) as ex:
+        batches = batch_transcripts([(doc_id, texts[doc_id]) for doc_id in pending])
+        for analyses in ex.map(lambda batch: analyze_batch_with_deepseek(batch, country), batches):
+            for doc_id, analysis in analyses.items():
+                results[doc_id] = analysis
+                CACHE.set(keys[doc_id], analysis, expire=ANALYSIS_TTL)
+        
+        # Fall back to independent per-document calls for whatever the batch missed
+        missing = [doc_id for doc_id, analysis in enumerate(results) if analysis is None]
+        for doc_id, analysis in zip(missing, ex.map(lambda i: analyze_with_deepseek(texts[i], country), missing)):
+            results[doc_id] = analysis
+    return results
+
+def batch_transcripts(documents):
+    """Group (doc_id, text) pairs so each request stays under MAX_BATCH_CHARS."""
+    batches, current, size = [], [], 0
+    for doc_id, text in documents:
+        text = text[:MAX_TRANSCRIPT_CHARS]
+        if current and size + len(text) > MAX_BATCH_CHARS:
+            batches.append(current)
+            current, size = [], 0
+        current.append((doc_id, text))
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=256)
+def deepseek_completion(system_prompt, user_content, max_tokens=2048, model=DEEPSEEK_MODEL):
+    """One chat completion parsed as JSON; cached per prompt, content and model."""
+    headers = {
+        "Authorization": f"Bearer {st.secrets['DEEPSEEK_API_KEY']}",
+        "Content-Type": "application/json"
+    }
     
     payload = {
-        "model": "deepseek-chat",
+        "model": model,
         "messages": [
-            {"role": "system", "content": system_prompt.format(country=country)},
-            {"role": "user", "content": text[:15000]}
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
         ],
         "temperature": 0.1,
+        "max_tokens": max_tokens,
+        "stream": True,
         "response_format": {"type": "json_object"}
     }
     
-    try:
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=30)
+    with DEEPSEEK_SESSION.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=30, stream=True) as response:
         response.raise_for_status()
-        
-        # Validate response structure
-        response_json = response.json()
-        if 'choices' not in response_json or len(response_json['choices']) == 0:
-            st.error("Unexpected API response structure")
-            return None
-            
-        return json.loads(response_json['choices'][0]['message']['content'])
-    except Exception as e:
-        st.error(f"DeepSeek API Error: {str(e)}")
-        return None
+        content = read_stream_content(response)
+    
+    # Validate response structure
+    if not content:
+        raise ValueError("Unexpected API response structure")
+    return json.loads(content)
+
+def read_stream_content(response):
+    """Concatenate the delta content of a server-sent-events chat completion."""
+    parts = []
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[len(b"data:"):].strip()
+        if data == b"[DONE]":
+            break
+        choices = json.loads(data).get("choices")
+        if choices:
+            parts.append(choices[0].get("delta", {}).get("content") or "")
+    return "".join(parts)
 
 # --------------------------
 # GPA Conversion
 # --------------------------
+# US GPA = offset + factor * original GPA, capped at 4.0
+GPA_SCALES = {
+    "India": (0.4, 0.0),         # 10-point scale
+    "Pakistan": (0.04, 0.0),     # Percentage
+    "Saudi Arabia": (0.8, 0.0),  # 5-point scale
+    "Germany": (-1.0, 5.0),      # 1.0 (best) to 5.0: 4 - (x - 1)
+    "Nigeria": (0.8, 0.0),       # 5-point scale
+    "Bangladesh": (1.0, 0.0)     # 4-point scale
+}
+_GPA_COUNTRIES = np.array(sorted(GPA_SCALES))
+# One extra trailing slot holds the identity conversion for unknown countries
+_GPA_FACTORS = np.array([GPA_SCALES[c][0] for c in _GPA_COUNTRIES] + [1.0])
+_GPA_OFFSETS = np.array([GPA_SCALES[c][1] for c in _GPA_COUNTRIES] + [0.0])
+
 def convert_gpa(original_gpa, country):
-    conversion_rules = {
-        "India": lambda x: (x / 10) * 4,
-        "Pakistan": lambda x: (x / 100) * 4,
-        "Saudi Arabia": lambda x: (x / 5) * 4,
-        "Germany": lambda x: 4 - ((x - 1) * 1),
-        "Nigeria": lambda x: (x / 5) * 4,
-        "Bangladesh": lambda x: (x / 4) * 4
-    }
-    return min(4.0, conversion_rules.get(country, lambda x: x)(original_gpa))
+    factor, offset = GPA_SCALES.get(country, (1.0, 0.0))
+    return min(4.0, offset + factor * original_gpa)
+
+def convert_gpa_batch(gpas, countries) -> np.ndarray:
+    """Vectorized convert_gpa over parallel arrays of GPAs and country names."""
+    gpas = np.asarray(gpas, dtype=np.float64)
+    countries = np.asarray(countries, dtype=str)
+    codes = np.searchsorted(_GPA_COUNTRIES, countries)
+    known = _GPA_COUNTRIES[np.minimum(codes, len(_GPA_COUNTRIES) - 1)] == countries
+    codes = np.where(known, codes, len(_GPA_COUNTRIES))
+    return np.minimum(4.0, _GPA_OFFSETS[codes] + _GPA_FACTORS[codes] * gpas)
 
 # --------------------------
 # Accreditation Checker
 # --------------------------
-@lru_cache(maxsize=1000)
-def check_accreditation(institution: str, country: str) -> bool:
+class RegistryUnavailable(Exception):
+    """A registry answered but its list could not be read."""
+
+def check_accreditation(institution: str, country: str):
+    """True/False once the registry answers, None if it could not be verified (request or parse failure)."""
+    key = normalize_inst(institution)
+    if not key:
+        return None  # Nothing comparable left after normalization
     try:
-        sleep(random.uniform(1, 3))  # Rate limiting
-        if country == "India":
-            return check_ugc_india(institution)
-        elif country == "Pakistan":
-            return check_hec_pakistan(institution)
-        elif country == "Saudi Arabia":
-            return check_moe_saudi(institution)
-        elif country == "Germany":
-            return check_anabin_germany(institution)
-        elif country == "Nigeria":
-            return check_nuc_nigeria(institution)
-        elif country == "Bangladesh":
-            return check_ugc_bangladesh(institution)
-        return False
+        return _check_accreditation(key, country, institution.strip())
+    except pybreaker.CircuitBreakerError:
+        return None
     except Exception as e:
-        st.error(f"Accreditation check failed: {str(e)}")
+        st.warning(f"Accreditation check failed: {str(e)}")
+        return None
+
+@CACHE.memoize(expire=ACCREDITATION_TTL, ignore={2})
+def _check_accreditation(key: str, country: str, institution: str) -> bool:
+    # Cached on the normalized key only; registries are searched with the name as written.
+    # Errors propagate so failed lookups are not cached
+    if country == "India":
+        return check_ugc_india(institution)
+    elif country == "Pakistan":
+        return check_hec_pakistan(institution)
+    elif country == "Saudi Arabia":
+        return check_moe_saudi(institution)
+    elif country == "Germany":
+        return check_anabin_germany(institution)
+    elif country == "Nigeria":
+        return check_nuc_nigeria(institution)
+    elif country == "Bangladesh":
+        return check_ugc_bangladesh(institution)
+    return False
+
+def normalize_inst(name: str) -> str:
+    """Canonical institution name: abbreviations expanded, casefolded, punctuation dropped (any script)."""
+    name = _ABBR.sub(lambda m: INSTITUTION_ABBREVIATIONS[m.group(1).lower()], name).replace("&", " and ")
+    return " ".join(re.sub(r"[\W_]+", " ", name.casefold()).split())
+
+def guess_institution(text: str):
+    """Best-effort institution name from the transcript header, before the LLM answers."""
+    for match in INSTITUTION_PATTERN.finditer(text[:2048]):
+        if len(normalize_inst(match.group(0)).split()) >= MIN_GUESS_WORDS:
+            return match.group(0).strip()
+    return None
+
+def same_institution(a: str, b: str) -> bool:
+    """Whether two spellings of an institution name are close enough to share an accreditation check."""
+    from rapidfuzz import fuzz
+    # Symmetric scorer: a name that is merely a subset of the other ("college") must not count as the same
+    return fuzz.token_sort_ratio(normalize_inst(a), normalize_inst(b)) >= INSTITUTION_MATCH_SCORE
+
+@st.cache_resource(show_spinner=False)
+def registry_buckets():
+    """Request timestamps per registry host over the last minute, shared by every session."""
+    buckets: dict[str, deque[float]] = defaultdict(deque)
+    return buckets, threading.Lock()
+
+BUCKETS, _BUCKETS_LOCK = registry_buckets()
+
+def throttle(url: str, max_per_min: int = REGISTRY_REQUESTS_PER_MIN):
+    """Wait only if the host of `url` has used up its requests for the current minute."""
+    host = urlparse(url).netloc
+    with _BUCKETS_LOCK:
+        now = monotonic()
+        q = BUCKETS[host]
+        while q and now - q[0] > 60:
+            q.popleft()
+        delay = max(0.0, q[-max_per_min] + 60 - now) if len(q) >= max_per_min else 0.0
+        q.append(now + delay)  # Reserve the slot before sleeping so concurrent callers queue behind it
+    if delay:
+        sleep(delay)
+
+@st.cache_resource(show_spinner=False)
+def registry_breakers():
+    """Per-host circuit breakers shared by every session, so failures add up across reruns and users.
+
+    A breaker trips after repeated failures so a down registry answers "could not verify" immediately.
+    """
+    return defaultdict(lambda: pybreaker.CircuitBreaker(fail_max=3, reset_timeout=120))
+
+BREAKERS = registry_breakers()
+
+def registry_request(method: str, url: str, **kwargs):
+    """Throttled request to a registry host, guarded by that host's circuit breaker."""
+    def send():
+        response = SESSION.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
+
+    throttle(url)
+    return BREAKERS[urlparse(url).netloc].call(send)
+
+@st.cache_resource(ttl=REGISTRY_INDEX_TTL, show_spinner=False)
+def registry_index(url: str) -> frozenset:
+    """Download a static registry page once and keep its normalized text entries in memory."""
+    selector = REGISTRY_INDEXES[url]
+    response = registry_request("GET", url)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(response.content, 'lxml')
+    entries = [node.get_text(" ") for node in soup.select(selector)] if selector else []
+    if not entries:
+        # No selector, or the layout changed: the whole page is one entry, so a name must appear in it verbatim
+        entries = [soup.get_text(" ")]
+    index = frozenset(filter(None, (normalize_inst(entry) for entry in entries)))
+    if not index:
+        # Raising keeps an empty page from being cached as "nothing is recognized"
+        raise RegistryUnavailable(f"No registry entries found at {url}")
+    return index
+
+@st.cache_resource(show_spinner=False)
+def start_registry_warmup():
+    """Once per process, fetch every static registry index concurrently in the background."""
+    executor = script_executor(max_workers=len(REGISTRY_INDEXES))
+    for url in REGISTRY_INDEXES:
+        executor.submit(registry_index, url)  # Failures are retried lazily by the checkers
+    executor.shutdown(wait=False)
+    return executor
+
+def in_registry(institution: str, index: frozenset) -> bool:
+    """The whole name must appear in an entry; fuzzy matching only tolerates small spelling differences."""
+    from rapidfuzz import fuzz, process
+    name = normalize_inst(institution)
+    if not name:
         return False
+    if name in index or any(name in entry for entry in index):
+        return True
+    # Never score against shorter entries: a generic word like "university" must not match "X University"
+    candidates = [entry for entry in index if len(entry) >= len(name)]
+    return process.extractOne(name, candidates, scorer=fuzz.ratio, score_cutoff=90) is not None
+
+def read_form_fields(response, ids):
+    """Stream an HTML page until the <input> elements with the given ids are seen; returns {id: value}."""
+    from lxml import etree
+    parser = etree.HTMLPullParser(events=("start",))
+    fields = {}
+    for chunk in response.iter_content(65536):
+        parser.feed(chunk)
+        for _, el in parser.read_events():
+            if el.tag == "input" and el.get("id") in ids:
+                fields[el.get("id")] = el.get("value")
+        if len(fields) == len(ids):
+            return fields
+    raise ValueError(f"Form fields not found: {', '.join(set(ids) - set(fields))}")
 
 def check_ugc_india(institution: str) -> bool:
-    session = requests.Session()
-    response = session.get("https://www.ugc.ac.in/recog_College.aspx")
-    soup = BeautifulSoup(response.text, 'html.parser')
-    viewstate = soup.find('input', {'id': '__VIEWSTATE'})['value']
-    eventval = soup.find('input', {'id': '__EVENTVALIDATION'})['value']
+    # The page carries a multi-MB __VIEWSTATE; stop reading once both hidden inputs are found
+    with registry_request("GET", UGC_INDIA_URL, stream=True) as response:
+        fields = read_form_fields(response, ("__VIEWSTATE", "__EVENTVALIDATION"))
 
     data = {
-        '__VIEWSTATE': viewstate,
-        '__EVENTVALIDATION': eventval,
+        '__VIEWSTATE': fields['__VIEWSTATE'],
+        '__EVENTVALIDATION': fields['__EVENTVALIDATION'],
         'ctl00$ContentPlaceHolder1$txtCollegeName': institution,
         'ctl00$ContentPlaceHolder1$btnSearch': 'Search'
     }
 
-    response = session.post("https://www.ugc.ac.in/recog_College.aspx", data=data)
+    response = registry_request("POST", UGC_INDIA_URL, data=data)
     return "No College Found" not in response.text
 
 def check_hec_pakistan(institution: str) -> bool:
-    response = requests.get("https://www.hec.gov.pk/english/universities/Pages/Recognized-Universities.aspx")
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return any(re.search(institution, div.text, re.I) for div in soup.select('div.university-name'))
+    return in_registry(institution, registry_index(HEC_PAKISTAN_URL))
 
 def check_moe_saudi(institution: str) -> bool:
-    response = requests.get("https://www.moe.gov.sa/en/education/highereducation/Pages/Government-Universities.aspx")
-    return institution.lower() in response.text.lower()
+    return in_registry(institution, registry_index(MOE_SAUDI_URL))
 
 def check_anabin_germany(institution: str) -> bool:
-    response = requests.get(f"https://anabin.kmk.org/no_cache/filter/institutionen.html?search=1&name={institution}")
+    response = registry_request("GET", ANABIN_GERMANY_URL, params={"search": 1, "name": institution})
     return "Keine Treffer gefunden" not in response.text
 
 def check_nuc_nigeria(institution: str) -> bool:
-    response = requests.get("https://www.nuc.edu.ng/nigerian-universities/")
-    return institution.lower() in response.text.lower()
+    return in_registry(institution, registry_index(NUC_NIGERIA_URL))
 
 def check_ugc_bangladesh(institution: str) -> bool:
-    response = requests.get("http://www.ugc.gov.bd/en/home/privateuniversity/2")
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return any(institution.lower() in li.text.lower() for li in soup.select('div.content-body li'))
+    return in_registry(institution, registry_index(UGC_BANGLADESH_URL))
 
 # --------------------------
 # Streamlit Interface
 # --------------------------
+def script_executor(max_workers):
+    """Thread pool whose workers can call st.* (e.g. st.error) for the current session."""
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx,
+                              initargs=(None, get_script_run_ctx()))
+
 def main():
     st.set_page_config(page_title="Transcript Evaluator Pro", layout="wide")
     st.title("🎓 University of Hartford Transcript Evaluation")
+    start_registry_warmup()
     
     with st.sidebar:
         st.header("Applicant Details")
         name = st.text_input("Full Name")
         country = st.selectbox("Country of Education", COUNTRIES)
-        uploaded_file = st.file_uploader("Upload Transcript", 
-                                       type=["pdf", "docx", "png", "jpg", "jpeg"])
+        uploaded_files = st.file_uploader("Upload Transcripts", 
+                                        type=["pdf", "docx", "png", "jpg", "jpeg"],
+                                        accept_multiple_files=True)
     
-    if uploaded_file and name:
-        with st.spinner("Analyzing transcript..."):
-            raw_text = extract_text(uploaded_file, country)
+    if uploaded_files and name:
+        with st.spinner("Analyzing transcripts..."):
+            documents = [(f, extract_text(f, country)) for f in uploaded_files]
+            documents = [(f, raw_text) for f, raw_text in documents if raw_text]
             
-            if raw_text:
-                analysis = analyze_with_deepseek(raw_text, country)
+            if documents:
+                # Overlap the registry scrapes with the LLM calls using regex guesses at the names
+                guesses = [guess_institution(raw_text) for _, raw_text in documents]
+                with script_executor(max_workers=min(DEEPSEEK_CONCURRENCY, 1 + len(documents))) as ex:
+                    analyses_future = ex.submit(analyze_transcripts, [raw_text for _, raw_text in documents], country)
+                    accreditation_futures = [
+                        ex.submit(check_accreditation, guess, country) if guess else None
+                        for guess in guesses
+                    ]
+                    wait([f for f in (analyses_future, *accreditation_futures) if f])
+                results = [
+                    (uploaded_file, guess, accreditation_future, analysis)
+                    for (uploaded_file, _), guess, accreditation_future, analysis
+                    in zip(documents, guesses, accreditation_futures, analyses_future.result())
+                    if analysis
+                ]
+                us_gpas = convert_gpa_batch([float(r[3]["original_gpa"]) for r in results], [country] * len(results))
                 
-                if analysis:
-                    us_gpa = convert_gpa(float(analysis["original_gpa"]), country)
-                    accredited = check_accreditation(analysis["institution_name"], country)
+                for (uploaded_file, guess, accreditation_future, analysis), us_gpa in zip(results, us_gpas):
+                    if len(documents) > 1:
+                        st.header(uploaded_file.name)
+                    
+                    if guess and same_institution(guess, analysis["institution_name"]):
+                        accredited = accreditation_future.result()
+                    else:
+                        accredited = check_accreditation(analysis["institution_name"], country)
                     
                     col1, col2 = st.columns(2)
                     with col1:
@@ -197,17 +616,20 @@ def main():
                         
                     with col2:
                         st.subheader("Verification")
-                        status = "✅ Recognized" if accredited else "❌ Not Recognized"
+                        if accredited is None:
+                            status = "⚠️ Could not verify"
+                        else:
+                            status = "✅ Recognized" if accredited else "❌ Not Recognized"
                         st.metric("Accreditation Status", status)
                         st.metric("Degree Equivalent", analysis["us_degree_equivalent"])
                         st.metric("Courses Analyzed", len(analysis["courses"]))
                     
                     st.subheader("Course Details")
-                    courses_df = pd.DataFrame(analysis["courses"])
                     st.dataframe(
-                        courses_df.style.format({"credits": "{:.0f}"}),
+                        analysis["courses"],
                         use_container_width=True,
-                        hide_index=True
+                        hide_index=True,
+                        column_config={"credits": st.column_config.NumberColumn(format="%d")}
                     )
 
 if __name__ == "__main__":